@@ -1,6 +1,21 @@
-from ._music_playlist_downloader import MusicPlaylistDownloader
-from ._music_downloader import MusicDownloader
-from ._metadata_setter import MetadataSetter
-from ._empty_deletion import EmptyDeletion
-from ._duplicate_finder import DuplicateFinder
-from .music_clients import MusicClient
\ No newline at end of file
+import importlib
+
+# Exported name -> module; resolved lazily so importing the package stays cheap
+_EXPORTS = {
+    'MusicPlaylistDownloader': '._music_playlist_downloader',
+    'MusicDownloader': '._music_downloader',
+    'MetadataSetter': '._metadata_setter',
+    'EmptyDeletion': '._empty_deletion',
+    'DuplicateFinder': '._duplicate_finder',
+    'MusicClient': '.music_clients',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
\ No newline at end of file
@@ -0,0 +1,186 @@
+# clients/music_clients/_download_scheduler.py
+
+import heapq
+import itertools
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+from utils.logger import SingletonLogger
+from utils.run_journal import UnitInterrupted
+
+# Lower runs first: playlist tracks are fetched before full discographies
+PRIORITIES = {'playlist': 0, 'artist': 1}
+
+
+def parse_clock(value):
+    """Parse 'HH:MM' into minutes after midnight; '24:00' is allowed as an end time."""
+    hours, minutes = (int(part) for part in value.split(':'))
+    if not (0 <= hours <= 24 and 0 <= minutes < 60) or (hours == 24 and minutes):
+        raise ValueError(f"Invalid time of day: {value}")
+    return hours * 60 + minutes
+
+
+class DownloadWindowClosed(UnitInterrupted):
+    """Raised from Throttle.consume() when the download window closes mid-transfer."""
+
+
+class Throttle:
+    """
+    Token bucket shared by every transfer; a rate of 0 means unlimited.
+
+    check, if given, is called from consume() at most every check_interval
+    seconds, so the scheduler can change the rate or stop a transfer at a chunk
+    boundary by raising from it.
+    """
+    def __init__(self, rate=0, check=None, check_interval=1.0):
+        self.rate = rate
+        self.allowance = rate
+        self.last_check = time.monotonic()
+        self.check = check
+        self.check_interval = check_interval
+        self._checked_at = self.last_check
+
+    def set_rate(self, rate):
+        if rate != self.rate:
+            self.rate = rate
+            self.allowance = min(self.allowance, rate)
+
+    def consume(self, size):
+        if self.check is not None and time.monotonic() - self._checked_at >= self.check_interval:
+            self.check()
+            self._checked_at = time.monotonic()
+        if not self.rate:
+            return
+        now = time.monotonic()
+        self.allowance = min(self.rate, self.allowance + (now - self.last_check) * self.rate)
+        self.last_check = now
+        self.allowance -= size
+        if self.allowance < 0:
+            time.sleep(-self.allowance / self.rate)
+
+
+class DownloadJob:
+    __slots__ = ('priority', 'sequence', 'label', 'destination', 'size', 'transfer')
+
+    def __init__(self, priority, sequence, label, destination, size, transfer):
+        self.priority = priority
+        self.sequence = sequence
+        self.label = label
+        self.destination = destination
+        self.size = size
+        self.transfer = transfer
+
+    def __lt__(self, other):
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+
+class DownloadScheduler:
+    """
+    Priority queue of downloads that respects the [download-scheduler] config:
+    a global bytes/s cap, time-of-day windows (each optionally with its own cap)
+    and a free-disk-space check against the size Plex reports for every file.
+    """
+    def __init__(self, config, logger=None):
+        self.logger = logger or SingletonLogger.get_logger()
+        options = config.get('download-scheduler', {})
+        self.max_bytes_per_second = options.get('max-bytes-per-second', 0)
+        self.min_free_bytes = options.get('min-free-bytes', 0)
+        self.windows = [
+            (parse_clock(window['start']), parse_clock(window['end']),
+             window.get('max-bytes-per-second', self.max_bytes_per_second))
+            for window in options.get('windows', [])
+        ]
+        # With windows, transfers re-check them while streaming and stop when one closes
+        self.throttle = Throttle(self.max_bytes_per_second, self._check_window if self.windows else None)
+        self.queue = []
+        self._sequence = itertools.count()
+        self.skipped = []
+
+    def submit(self, kind, label, destination, size, transfer):
+        """
+        Queue a transfer.
+
+        :param kind: 'playlist' or 'artist', used for ordering
+        :param label: Human-readable name for logging
+        :param destination: Directory the file will be written to
+        :param size: Expected size in bytes as reported by Plex, or None if unknown (only the reserve is checked)
+        :param transfer: Callable taking the shared Throttle; returns True on success
+        """
+        job = DownloadJob(PRIORITIES.get(kind, len(PRIORITIES)), next(self._sequence), label, destination, size, transfer)
+        heapq.heappush(self.queue, job)
+
+    def run(self):
+        """Run queued transfers in priority order. Returns the number of successful ones."""
+        self.logger.info(f"Download scheduler starting with {len(self.queue)} queued transfers")
+        completed = 0
+        while self.queue:
+            job = heapq.heappop(self.queue)
+            self._wait_for_window()
+            if not self._has_space_for(job):
+                self.skipped.append(job.label)
+                continue
+            try:
+                if job.transfer(self.throttle):
+                    completed += 1
+            except DownloadWindowClosed:
+                # Keeps its place in the queue; the next iteration waits for a window between jobs
+                self.logger.info(f"Download window closed during {job.label}, queued again")
+                heapq.heappush(self.queue, job)
+            except Exception as e:
+                self.logger.error(f"Transfer failed for {job.label}: {str(e)}")
+        if self.skipped:
+            self.logger.warning(f"Skipped {len(self.skipped)} transfers for lack of disk space")
+        self.logger.info(f"Download scheduler finished: {completed} transfers completed")
+        return completed
+
+    def _current_window(self, now):
+        """Return the rate of the window containing now, or None if outside every window."""
+        if not self.windows:
+            return self.max_bytes_per_second
+        minute = now.hour * 60 + now.minute
+        for start, end, rate in self.windows:
+            inside = start <= minute < end if start <= end else (minute >= start or minute < end)
+            if inside:
+                return rate
+        return None
+
+    def _check_window(self):
+        """Throttle check while streaming: apply the open window's cap, or stop at this chunk if none is open."""
+        rate = self._current_window(datetime.now())
+        if rate is None:
+            raise DownloadWindowClosed("Download window closed")
+        self.throttle.set_rate(rate)
+
+    def _wait_for_window(self):
+        rate = self._current_window(datetime.now())
+        if rate is None:
+            now = datetime.now()
+            midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            starts = [midnight + timedelta(minutes=start) for start, _, _ in self.windows]
+            starts = [start if start > now else start + timedelta(days=1) for start in starts]
+            resume_at = min(starts)
+            self.logger.info(f"Outside download windows, pausing until {resume_at:%H:%M}")
+            time.sleep((resume_at - now).total_seconds())
+            rate = self._current_window(datetime.now())
+            if rate is None:
+                rate = self.max_bytes_per_second
+        self.throttle.set_rate(rate)
+
+    def _has_space_for(self, job):
+        if not job.size and not self.min_free_bytes:
+            return True
+        existing = job.destination
+        while not os.path.exists(existing):
+            parent = os.path.dirname(existing)
+            if parent == existing:
+                return True
+            existing = parent
+        free = shutil.disk_usage(existing).free
+        if free - (job.size or 0) < self.min_free_bytes:
+            self.logger.warning(
+                f"Not enough disk space for {job.label}: {job.size} bytes needed, "
+                f"{free} free, {self.min_free_bytes} reserved"
+            )
+            return False
+        return True
\ No newline at end of file
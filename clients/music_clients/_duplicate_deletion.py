@@ -4,6 +4,6 @@ class DuplicateDeletion:
         self.config = config
         self.deleted_duplicates = []
 
-    def delete_duplicates(self):
-        # Implement duplicate deletion logic here
+    def delete_duplicates(self, paths=None):
+        # Implement duplicate deletion logic here; paths limits deletion to these album folders
         pass
\ No newline at end of file
@@ -4,6 +4,6 @@ class DuplicateFinder:
         self.config = config
         self.duplicates = []
 
-    def find_duplicates(self):
-        # Implement duplicate finding logic here
+    def find_duplicates(self, paths=None):
+        # Implement duplicate finding logic here; paths limits the search to these album folders
         pass
\ No newline at end of file
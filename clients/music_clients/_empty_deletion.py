@@ -4,10 +4,10 @@ class EmptyDeletion:
         self.config = config
         self.deleted_folders = []
 
-    def find_empty_folders(self):
-        # Implement empty folder finding logic here
+    def find_empty_folders(self, paths=None):
+        # Implement empty folder finding logic here; paths limits the search to these album folders
         pass
 
-    def delete_empty_folders(self):
-        # Implement empty folder deletion logic here
+    def delete_empty_folders(self, paths=None):
+        # Implement empty folder deletion logic here; paths limits deletion to these album folders
         pass
\ No newline at end of file
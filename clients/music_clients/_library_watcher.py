@@ -0,0 +1,127 @@
+# clients/music_clients/_library_watcher.py
+
+import os
+import time
+from utils.logger import SingletonLogger
+
+
+class LibraryWatcher:
+    """
+    Watches music_library with inotify and yields batches of changed album folders.
+
+    Events are coalesced per album folder: a folder is only reported once no new
+    event has touched it for debounce-seconds, so copying an album in produces a
+    single batch entry. Between events the process blocks in read() and uses no CPU.
+    """
+    def __init__(self, config, logger=None):
+        # Optional dependency, only needed for watch mode
+        from inotify_simple import INotify, flags
+
+        self.logger = logger or SingletonLogger.get_logger()
+        self.flags = flags
+        self.music_library = os.path.normpath(config['directories']['music_library'])
+        self.album_depth = config.get('path-mapping', {}).get('album-depth', 2)
+        self.debounce = config.get('watch', {}).get('debounce-seconds', 10)
+        self.mask = (flags.CLOSE_WRITE | flags.MOVED_TO | flags.MOVED_FROM | flags.CREATE
+                     | flags.DELETE | flags.DELETE_SELF)
+        self.inotify = INotify()
+        self.watches = {}
+        self.pending = {}
+        self.rescan = False
+        self._add_tree(self.music_library)
+        self.logger.info(f"Watching {len(self.watches)} folders under {self.music_library}")
+
+    def _add_tree(self, root):
+        """Watch root and every folder below it; returns the folders found."""
+        directories = []
+        for directory, _, _ in os.walk(root):
+            try:
+                self.watches[self.inotify.add_watch(directory, self.mask)] = directory
+                directories.append(directory)
+            except OSError as e:
+                self.logger.warning(f"Cannot watch {directory}: {str(e)}")
+        return directories
+
+    def _album_dir(self, path):
+        relative = os.path.relpath(path, self.music_library)
+        if relative.startswith('..') or relative == '.':
+            return None
+        parts = relative.split(os.sep)
+        if len(parts) < self.album_depth:
+            return None
+        return os.path.join(self.music_library, *parts[:self.album_depth])
+
+    def _handle(self, event, now):
+        if event.mask & self.flags.Q_OVERFLOW:
+            self.logger.warning("inotify queue overflowed, rescanning the whole library")
+            return True
+        if event.mask & self.flags.IGNORED:
+            self.watches.pop(event.wd, None)
+            return False
+        directory = self.watches.get(event.wd)
+        if directory is None:
+            return False
+        path = os.path.join(directory, event.name) if event.name else directory
+        touched = [path]
+        if event.mask & self.flags.ISDIR and event.mask & (self.flags.CREATE | self.flags.MOVED_TO):
+            # Files may land in a new folder before its watch exists, so count the whole subtree as changed
+            touched.extend(self._add_tree(path))
+        for changed in touched:
+            album = self._album_dir(changed)
+            if album:
+                self.pending[album] = now
+        return False
+
+    def batches(self):
+        """Yield lists of album folders that have settled; None means rescan everything."""
+        while True:
+            if self.rescan:
+                # The queue overflowed while a batch was being processed
+                self.rescan = False
+                self.pending.clear()
+                yield None
+                continue
+            if self.pending:
+                timeout = max(0, min(self.pending.values()) + self.debounce - time.monotonic())
+                events = self.inotify.read(timeout=int(timeout * 1000))
+            else:
+                events = self.inotify.read()
+
+            now = time.monotonic()
+            overflow = False
+            for event in events:
+                overflow = self._handle(event, now) or overflow
+            if overflow:
+                self.pending.clear()
+                yield None
+                continue
+
+            ready = sorted(album for album, last_seen in self.pending.items() if now - last_seen >= self.debounce)
+            if ready:
+                for album in ready:
+                    del self.pending[album]
+                yield ready
+
+    def discard(self, albums):
+        """
+        Drop pending changes to albums made while they were being processed.
+
+        The stages write to and delete from the albums they process; reading
+        those events here keeps them from coming back as a new batch. None
+        (a whole-library batch) drops everything pending.
+        """
+        now = time.monotonic()
+        while True:
+            events = self.inotify.read(timeout=0)
+            if not events:
+                break
+            for event in events:
+                self.rescan = self._handle(event, now) or self.rescan
+        if albums is None:
+            self.pending.clear()
+        else:
+            for album in albums:
+                self.pending.pop(album, None)
+
+    def close(self):
+        self.inotify.close()
\ No newline at end of file
@@ -0,0 +1,210 @@
+# clients/music_clients/_lossy_mirror.py
+
+import base64
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from utils.logger import SingletonLogger
+from utils.run_journal import RunJournal
+from ._track_record import scan_library
+
+SOURCE_EXTENSIONS = ('.flac', '.wav', '.aiff', '.ape', '.wv', '.mp3', '.m4a', '.ogg', '.opus')
+# Containers that can carry cover art as an attached picture stream
+ART_STREAM_EXTENSIONS = ('.mp3', '.m4a')
+MANIFEST_NAME = '.mirror-manifest.json'
+
+
+def _transcode(source, target, codec, bitrate):
+    """Encode one file in a worker process. Returns (source, audio seconds, encode seconds)."""
+    import ffmpeg
+
+    info = ffmpeg.probe(source)
+    duration = float(info['format'].get('duration', 0))
+    extension = os.path.splitext(target)[1].lower()
+    has_art = any(stream['codec_type'] == 'video' for stream in info['streams'])
+
+    source_input = ffmpeg.input(source)
+    streams = [source_input['a']]
+    options = {'acodec': codec, 'audio_bitrate': bitrate, 'map_metadata': 0, 'threads': 1}
+    if has_art and extension in ART_STREAM_EXTENSIONS:
+        streams.append(source_input['v'])
+        options.update({'vcodec': 'copy', 'disposition:v': 'attached_pic'})
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    temp_path = os.path.join(os.path.dirname(target), f".partial-{os.path.basename(target)}")
+    started = time.perf_counter()
+    try:
+        ffmpeg.output(*streams, temp_path, **options).overwrite_output().run(quiet=True)
+        if has_art and extension not in ART_STREAM_EXTENSIONS:
+            _embed_ogg_art(source, temp_path)
+        os.replace(temp_path, target)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return source, duration, time.perf_counter() - started
+
+
+def _embed_ogg_art(source, target):
+    """Copy FLAC pictures, ID3 APIC frames or MP4 covr atoms into an Ogg file's METADATA_BLOCK_PICTURE."""
+    import mutagen
+    from mutagen.flac import Picture
+    from mutagen.mp4 import MP4Cover
+
+    source_file = mutagen.File(source)
+    pictures = list(getattr(source_file, 'pictures', []))
+    if not pictures and source_file is not None and source_file.tags is not None:
+        for key in source_file.tags.keys():
+            if key.startswith('APIC'):
+                frame = source_file.tags[key]
+                picture = Picture()
+                picture.data, picture.mime, picture.type = frame.data, frame.mime, frame.type
+                pictures.append(picture)
+            elif key == 'covr':
+                for cover in source_file.tags[key]:
+                    picture = Picture()
+                    picture.data = bytes(cover)
+                    picture.mime = 'image/png' if cover.imageformat == MP4Cover.FORMAT_PNG else 'image/jpeg'
+                    picture.type = 3  # Front cover; MP4 does not record a picture type
+                    pictures.append(picture)
+    if not pictures:
+        return
+
+    target_file = mutagen.File(target)
+    target_file['metadata_block_picture'] = [base64.b64encode(picture.write()).decode('ascii') for picture in pictures]
+    target_file.save()
+
+
+class LossyMirror:
+    """
+    Mirrors music_library to a lossy codec for portable devices.
+
+    Files are encoded by a pool of ffmpeg worker processes. A manifest in the
+    mirror root records each source's size and mtime, so unchanged files are
+    skipped on later runs; mirror files without a source are removed.
+    """
+    def __init__(self, config):
+        self.config = config
+        self.logger = SingletonLogger.get_logger()
+        options = config.get('lossy_mirror', {})
+        self.music_library = os.path.normpath(config['directories']['music_library'])
+        self.mirror_directory = os.path.normpath(options.get('mirror_directory', 'mirror'))
+        self.codec = options.get('codec', 'libopus')
+        self.bitrate = options.get('bitrate', '160k')
+        self.extension = options.get('extension', '.opus')
+        self.workers = options.get('workers') or os.cpu_count()
+        self.manifest_path = os.path.join(self.mirror_directory, MANIFEST_NAME)
+        self.encoded_files = []
+
+    def mirror_library(self, paths=None):
+        """
+        Bring the mirror up to date.
+
+        :param paths: Album folders to limit the update to; None mirrors the whole library
+        """
+        manifest = self._load_manifest()
+        journal = RunJournal.get_journal()
+        roots = [os.path.normpath(path) for path in paths] if paths else [self.music_library]
+        sources = self._scan_sources(roots)
+
+        jobs = {}
+        for relative, record in sources.items():
+            size, mtime = record.size, record.mtime
+            target = self._target_for(relative)
+            if manifest.get(relative) == [size, mtime] and os.path.exists(target):
+                continue
+            if journal.is_done('mirror', self._unit(relative, size, mtime)) and os.path.exists(target):
+                # Encoded by an interrupted run whose manifest was never saved
+                manifest[relative] = [size, mtime]
+                continue
+            jobs[relative] = target
+        self.logger.info(f"Mirror: {len(sources)} source files, {len(jobs)} to encode")
+
+        try:
+            self._encode(jobs, sources, manifest, journal)
+        finally:
+            for relative in [key for key in manifest if self._under_roots(key, roots) and key not in sources]:
+                del manifest[relative]
+            self._save_manifest(manifest)
+        self._remove_orphans(roots, {self._target_for(relative) for relative in sources})
+
+    def _encode(self, jobs, sources, manifest, journal):
+        if not jobs:
+            return
+        audio_seconds = encode_seconds = 0.0
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(_transcode, os.path.join(self.music_library, relative), target, self.codec, self.bitrate): relative
+                for relative, target in jobs.items()
+            }
+            for future in as_completed(futures):
+                relative = futures[future]
+                record = sources[relative]
+                unit = self._unit(relative, record.size, record.mtime)
+                try:
+                    _, duration, elapsed = future.result()
+                except Exception as e:
+                    journal.record('mirror', unit, 'failed', str(e))
+                    self.logger.error(f"Failed to encode {relative}: {str(e)}")
+                    continue
+                journal.record('mirror', unit, 'done')
+                manifest[relative] = [record.size, record.mtime]
+                self.encoded_files.append(relative)
+                audio_seconds += duration
+                encode_seconds += elapsed
+
+        wall_seconds = time.perf_counter() - started
+        if encode_seconds and wall_seconds:
+            self.logger.info(
+                f"Encoded {len(self.encoded_files)} files ({audio_seconds / 3600:.2f} h of audio) in {wall_seconds:.1f}s: "
+                f"{audio_seconds / encode_seconds:.1f}x realtime per core, "
+                f"{audio_seconds / wall_seconds:.1f}x realtime overall on {self.workers} workers"
+            )
+
+    def _scan_sources(self, roots):
+        """Map library-relative source paths to their TrackRecord."""
+        return {
+            os.path.relpath(record.path, self.music_library): record
+            for record in scan_library(roots, SOURCE_EXTENSIONS)
+        }
+
+    @staticmethod
+    def _unit(relative, size, mtime):
+        return f"{relative}:{size}:{mtime}"
+
+    def _target_for(self, relative):
+        return os.path.join(self.mirror_directory, os.path.splitext(relative)[0] + self.extension)
+
+    def _under_roots(self, relative, roots):
+        path = os.path.join(self.music_library, relative)
+        return any(os.path.commonpath([path, root]) == root for root in roots)
+
+    def _remove_orphans(self, roots, expected):
+        mirror_roots = [os.path.normpath(os.path.join(self.mirror_directory, os.path.relpath(root, self.music_library))) for root in roots]
+        for mirror_root in mirror_roots:
+            for directory, _, files in os.walk(mirror_root, topdown=False):
+                for name in files:
+                    path = os.path.join(directory, name)
+                    if path != self.manifest_path and path not in expected:
+                        os.remove(path)
+                        self.logger.info(f"Removed orphaned mirror file: {path}")
+                if directory != self.mirror_directory and not os.listdir(directory):
+                    os.rmdir(directory)
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            self.logger.warning(f"Ignoring unreadable mirror manifest {self.manifest_path}: {str(e)}")
+            return {}
+
+    def _save_manifest(self, manifest):
+        os.makedirs(self.mirror_directory, exist_ok=True)
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(temp_path, self.manifest_path)
\ No newline at end of file
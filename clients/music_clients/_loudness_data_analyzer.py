@@ -4,6 +4,6 @@ class LoudnessDataAnalyzer:
         self.config = config
         self.analyzed_tracks = []
 
-    def analyze_loudness(self):
-        # Implement loudness analysis logic here
+    def analyze_loudness(self, paths=None):
+        # Implement loudness analysis logic here; paths limits analysis to these album folders
         pass
\ No newline at end of file
@@ -1,11 +1,43 @@
 # clients/music_clients/metadata_setter.py
+import os
+from ._name_canonicalizer import NameCanonicalizer
+
 class MetadataSetter:
     def __init__(self, config):
         self.config = config
+        self.canonicalizer = NameCanonicalizer(config)
         self.updated_albums = []
         self.updated_artists = []
         self.updated_genres = []
 
+    def set_metadata(self, paths=None):
+        # paths limits tagging to these album folders; None tags the whole library
+        self.update_aliases(paths)
+        self.set_album_cover()
+        self.set_artist_picture()
+        self.set_genre()
+
+    def update_aliases(self, paths=None):
+        """
+        Cluster artist folder names, and album folder names per artist, into the shared alias map.
+
+        With paths, only the album names of the artists owning those album folders
+        are clustered again; artist names are only clustered over the whole library.
+        """
+        music_library = self.config['directories']['music_library']
+        if paths is None:
+            artists = [entry.name for entry in os.scandir(music_library) if entry.is_dir()]
+        else:
+            artists = sorted({os.path.relpath(path, music_library).split(os.sep)[0] for path in paths})
+        albums_by_artist = {
+            artist: [album.name for album in os.scandir(os.path.join(music_library, artist)) if album.is_dir()]
+            for artist in artists if os.path.isdir(os.path.join(music_library, artist))
+        }
+        if paths is None:
+            self.canonicalizer.update(artists, 'artists')
+        self.canonicalizer.update_albums(albums_by_artist)
+        self.canonicalizer.save()
+
     def set_album_cover(self):
         # Implement album cover setting logic here
         pass
@@ -2,6 +2,12 @@
 
 import os
 from utils.logger import SingletonLogger
+from utils.shard import Shard
+from utils.run_journal import RunJournal
+from ._download_scheduler import DownloadScheduler
+from ._path_mapper import PathMapper
+from ._name_canonicalizer import NameCanonicalizer
+from ._track_record import TrackRecord
 
 class MusicDownloader:
     def __init__(self, service_clients, config, logger=None):
@@ -12,14 +18,71 @@ class MusicDownloader:
         self.music_library = self.config['directories']['music_library'].replace('\\', '/')
         self.artwork_directory = self.config['directories']['artwork_directory'].replace('\\', '/')
         self.playlists_directory = self.config['directories']['playlists_directory'].replace('\\', '/')
+        self.shard = Shard()
+        self.scheduler = DownloadScheduler(self.config, self.logger)
+        self.path_mapper = PathMapper(self.config, self.logger)
+        self.canonicalizer = NameCanonicalizer(self.config, self.logger)
+        self.download_type = None
+        self.journal = RunJournal.get_journal()
+        self.current_target = None
+        self.target_pending = {}
+        self.failed_targets = set()
+        self.queued_images = set()
+        # Track path -> (kind, record, album path, targets); a track is transferred once however many targets share it
+        self.queued_tracks = {}
+        self.pending_playlists = []
 
-    def download_music(self, download_type, targets):
+    def download_music(self, download_type, targets, shard=None):
         """
-        Main method to orchestrate music downloading based on config.
+        Queue and run all downloads for one kind of target.
+
+        :param download_type: Either 'artist' or 'playlist'
+        :param targets: List of artists or playlists to download
+        :param shard: Shard handled by this process (default: everything)
+        """
+        self.queue_music(download_type, targets, shard)
+        self.run_queue()
+
+    def run_queue(self):
+        """Run every queued transfer, playlists first, then write m3u8 files and journal finished targets."""
+        completed = self.scheduler.run()
+        completed += self.journal.retry_failed('download', self._retry_round)
+        self._write_playlists()
+        for target, pending in self.target_pending.items():
+            if target in self.failed_targets:
+                self.journal.record('download', target, 'failed')
+            elif pending:
+                self.journal.record('download', target, 'failed', f"{pending} transfers not completed")
+            else:
+                self.journal.record('download', target, 'done')
+        self.target_pending.clear()
+        self.failed_targets.clear()
+        self.queued_tracks.clear()
+        return completed
+
+    def _retry_round(self, attempts):
+        """Run a journal retry round through the scheduler, so retries pass its window and disk-space checks."""
+        for unit, retry in attempts:
+            kind, record, album_path, _ = self.queued_tracks[unit]
+            self.scheduler.submit(kind, record.title, album_path, record.size, lambda throttle, retry=retry: retry())
+        self.scheduler.run()
+
+    def queue_music(self, download_type, targets, shard=None):
+        """
+        Resolve targets and queue their track transfers on the download scheduler.
         
+        Shards split the work by album folder: every shard walks every artist and
+        playlist but only downloads the albums whose folder it owns, so targets that
+        share albums never write to the same folder. Artist images belong to the shard
+        owning the Plex artist title, m3u8 files to the shard owning the playlist name.
+
         :param download_type: Either 'artist' or 'playlist'
         :param targets: List of artists or playlists to download
+        :param shard: Shard handled by this process (default: everything)
         """
+        self.shard = shard or Shard()
+        self.download_type = download_type
+        self.journal = RunJournal.get_journal()
         try:
             if download_type == 'artist':
                 self._download_artists(targets)
@@ -33,19 +96,35 @@ class MusicDownloader:
     def _download_artists(self, artists):
         """Download music for all specified artists."""
         for artist in artists:
+            if not self._start_target(artist):
+                continue
             try:
                 self._download_artist(artist)
             except Exception as e:
+                self.failed_targets.add(self.current_target)
                 self.logger.error(f"Failed to download artist {artist}: {str(e)}")
 
     def _download_playlists(self, playlists):
         """Download music for all specified playlists."""
         for playlist in playlists:
+            if not self._start_target(playlist):
+                continue
             try:
                 self._download_playlist(playlist)
             except Exception as e:
+                self.failed_targets.add(self.current_target)
                 self.logger.error(f"Failed to download playlist {playlist}: {str(e)}")
 
+    def _start_target(self, name):
+        """Make name the current target; False if a previous run already completed it."""
+        unit = f"{self.download_type}:{name}"
+        if self.journal.is_done('download', unit):
+            self.logger.info(f"Skipping {unit}, completed in a previous run")
+            return False
+        self.current_target = unit
+        self.target_pending.setdefault(unit, 0)
+        return True
+
     def _download_artist(self, artist_name):
         """Download all music for a given artist and the artist image."""
         try:
@@ -55,13 +134,14 @@ class MusicDownloader:
                 return
 
             for artist in artists:
-                if artist_name.lower() in artist.title.lower():
-                    self._download_artist_image(artist)
+                if self.canonicalizer.same_name(artist_name, artist.title):
+                    self._download_artist_image(artist.title)
                     for album in artist.albums():
                         self._download_album(album)
 
             self.logger.info(f"Finished downloading music for artist: {artist_name}")
         except Exception as e:
+            self.failed_targets.add(self.current_target)
             self.logger.error(f"Error downloading artist {artist_name}: {str(e)}")
 
     def _download_playlist(self, playlist_name):
@@ -72,35 +152,45 @@ class MusicDownloader:
                 self.logger.warning(f"No playlist found with name: {playlist_name}")
                 return
 
-            m3u8_content = "#EXTM3U\n"
-            os.makedirs(self.playlists_directory, exist_ok=True)
-
+            entries = []
             for item in playlist.items():
-                track_path = self._download_track(item)
+                album_path = self._get_track_album_path(item)
+                owned = self._owns_album(album_path)
+                if owned:
+                    track_path = self._download_track(item, album_path)
+                else:
+                    track_path = self._get_track_path(item, album_path)
                 if track_path:
-                    m3u8_content += f"#EXTINF:{int(item.duration/1000)},{item.grandparentTitle} - {item.title}\n{track_path}\n"
+                    entries.append((f"#EXTINF:{int(item.duration/1000)},{item.grandparentTitle} - {item.title}", track_path, owned))
                 
                 # Download artist image after downloading the track
                 self._download_artist_image(item.grandparentTitle)
 
-            m3u8_path = os.path.join(self.playlists_directory, f"{playlist_name}.m3u8").replace('\\', '/')
-            with open(m3u8_path, 'w', encoding='utf-8') as f:
-                f.write(m3u8_content)
-            self.logger.info(f"Created playlist file: {m3u8_path}")
+            if not self.shard.owns(playlist_name):
+                self.logger.info(f"Playlist file for {playlist_name} belongs to another shard")
+                return
+            # Written once the queue has run, so tracks skipped by the scheduler are left out
+            self.pending_playlists.append((playlist_name, entries))
         except Exception as e:
+            self.failed_targets.add(self.current_target)
             self.logger.error(f"Error downloading playlist {playlist_name}: {str(e)}")
 
     def _download_album(self, album):
         """Download all tracks in an album and its cover."""
         try:
-            album_path = self._get_album_path(album)
+            tracks = album.tracks()
+            album_path = self._get_album_path(album, tracks[0] if tracks else None)
+            if not self._owns_album(album_path):
+                self.logger.debug(f"Album folder {album_path} belongs to another shard")
+                return
             os.makedirs(album_path, exist_ok=True)
 
-            for track in album.tracks():
+            for track in tracks:
                 self._download_track(track, album_path)
 
             self._download_album_cover(album, album_path)
         except Exception as e:
+            self.failed_targets.add(self.current_target)
             self.logger.error(f"Error downloading album {album.title}: {str(e)}")
 
     def _download_track(self, track, album_path=None):
@@ -108,44 +198,129 @@ class MusicDownloader:
         try:
             self.logger.debug(f"Attempting to download track: {track.title}")
             if album_path is None:
-                album_path = self._get_album_path(track.album())
+                album_path = self._get_track_album_path(track)
             self.logger.debug(f"Album path: {album_path}")
 
-            # Use the original filename from Plex
-            original_filename = os.path.basename(track.media[0].parts[0].file)
-            self.logger.debug(f"Original filename: {original_filename}")
-            track_path = os.path.join(album_path, original_filename).replace('\\', '/')
+            track_path = self._get_track_path(track, album_path)
             self.logger.debug(f"Full track path: {track_path}")
 
-            if os.path.exists(track_path):
+            target = self.current_target
+            if os.path.exists(track_path) or self.journal.is_done('download', track_path):
                 self.logger.info(f"Track already exists: {track_path}")
+            elif track_path in self.queued_tracks:
+                # Also wanted by another target, e.g. a playlist and a discography: count it for this one too
+                targets = self.queued_tracks[track_path][3]
+                if target not in targets:
+                    targets.append(target)
+                    self.target_pending[target] = self.target_pending.get(target, 0) + 1
             else:
-                self.logger.debug("Calling service_clients.download_track")
-                success = self.service_clients.download_track(track, album_path, keep_original_name=True)
-                if success:
-                    self.logger.info(f"Downloaded: {track_path}")
-                else:
-                    self.logger.error(f"Failed to download: {track_path}")
+                # Queue a detached snapshot so the Plex object can be released
+                record = TrackRecord.from_plex(track, track_path)
+                self.queued_tracks[track_path] = (self.download_type, record, album_path, [target])
+                self.target_pending[target] = self.target_pending.get(target, 0) + 1
+                self.scheduler.submit(
+                    self.download_type, record.title, album_path, record.size,
+                    lambda throttle: self._run_transfer(record, album_path, throttle)
+                )
+                self.logger.debug(f"Queued download: {track_path}")
 
             return track_path
         except Exception as e:
+            self.failed_targets.add(self.current_target)
             self.logger.error(f"Error downloading track {track.title}: {str(e)}")
             return None
 
+    def _run_transfer(self, record, album_path, throttle):
+        """
+        Transfer a queued track through the run journal and account for its targets.
+
+        A failed transfer is retried by the journal after the queue has run; its
+        targets only stay pending if every attempt fails.
+        """
+        def done():
+            for target in self.queued_tracks[record.path][3]:
+                self.target_pending[target] -= 1
+
+        return self.journal.run_unit(
+            'download', record.path, lambda: self._transfer_track(record, album_path, throttle), done
+        )
+
+    def _transfer_track(self, record, album_path, throttle):
+        """Scheduler callback performing the actual transfer of a queued track."""
+        track_path = record.path
+        if os.path.exists(track_path):
+            self.logger.info(f"Track already exists: {track_path}")
+            return True
+        self.logger.debug("Calling service_clients.download_track")
+        success = self.service_clients.download_track(record, album_path, keep_original_name=True, throttle=throttle)
+        if success:
+            self.logger.info(f"Downloaded: {track_path}")
+        else:
+            self.logger.error(f"Failed to download: {track_path}")
+        return success
+
+    @staticmethod
+    def _get_track_path(track, album_path):
+        """Local path of a track, using the original filename from Plex."""
+        original_filename = os.path.basename(track.media[0].parts[0].file)
+        return os.path.join(album_path, original_filename).replace('\\', '/')
+
+    def _owns_album(self, album_path):
+        """Whether this shard is responsible for writing into an album folder."""
+        return self.shard.owns(os.path.relpath(album_path, self.music_library).replace('\\', '/'))
+
+    def _write_playlists(self):
+        """Write the m3u8 files of queued playlists, leaving out tracks this shard failed to download."""
+        if not self.pending_playlists:
+            return
+        os.makedirs(self.playlists_directory, exist_ok=True)
+        for playlist_name, entries in self.pending_playlists:
+            m3u8_content = "#EXTM3U\n"
+            for extinf, track_path, owned in entries:
+                if owned and not os.path.exists(track_path):
+                    self.logger.warning(f"Leaving {track_path} out of {playlist_name}: not downloaded")
+                    continue
+                m3u8_content += f"{extinf}\n{track_path}\n"
+            m3u8_path = os.path.join(self.playlists_directory, f"{playlist_name}.m3u8").replace('\\', '/')
+            with open(m3u8_path, 'w', encoding='utf-8') as f:
+                f.write(m3u8_content)
+            self.logger.info(f"Created playlist file: {m3u8_path}")
+        self.pending_playlists.clear()
+
     def _download_album_cover(self, album, album_path):
-        """Download the album cover."""
+        """Queue the album cover on the download scheduler."""
+        cover_path = os.path.join(album_path, "cover.jpg").replace('\\', '/')
+        if os.path.exists(cover_path):
+            self.logger.info(f"Album cover already exists: {cover_path}")
+            return
+        self.scheduler.submit(
+            self.download_type, f"cover of {album.title}", album_path, None,
+            lambda throttle: self._transfer_image(
+                cover_path, throttle, lambda: self.service_clients.download_album_cover(album, cover_path)
+            )
+        )
+
+    def _transfer_image(self, image_path, throttle, download):
+        """Scheduler callback downloading an album cover or artist image, charged to the throttle afterwards."""
+        if os.path.exists(image_path):
+            return True
         try:
-            cover_path = os.path.join(album_path, "cover.jpg").replace('\\', '/')
-            if not os.path.exists(cover_path):
-                self.service_clients.download_album_cover(album, cover_path)
-                self.logger.info(f"Downloaded album cover: {cover_path}")
-            else:
-                self.logger.info(f"Album cover already exists: {cover_path}")
+            os.makedirs(os.path.dirname(image_path), exist_ok=True)
+            if download() is False:
+                self.logger.warning(f"Failed to download image: {image_path}")
+                return False
         except Exception as e:
-            self.logger.error(f"Failed to download album cover for {album.title}: {str(e)}")
+            self.logger.error(f"Failed to download image {image_path}: {str(e)}")
+            return False
+        throttle.consume(os.path.getsize(image_path))
+        self.logger.info(f"Downloaded image: {image_path}")
+        return True
 
     def _download_artist_image(self, artist_name):
-        """Download the artist image."""
+        """Queue the artist image on the download scheduler, once per artist."""
+        if artist_name in self.queued_images:
+            return
+        self.queued_images.add(artist_name)
         try:
             self.logger.debug(f"Attempting to download image for artist: {artist_name}")
             artists = self.service_clients.search_music(artist_name, 'artist')
@@ -154,45 +329,42 @@ class MusicDownloader:
                 return
 
             for artist in artists:
-                if artist_name.lower() in artist.title.lower():
+                if self.canonicalizer.same_name(artist_name, artist.title):
+                    if not self.shard.owns(artist.title):
+                        break
                     artist_path = os.path.join(self.artwork_directory, artist.title).replace('\\', '/')
-                    os.makedirs(artist_path, exist_ok=True)
                     cover_path = os.path.join(artist_path, "cover.jpg").replace('\\', '/')
                     self.logger.debug(f"Artist image path: {cover_path}")
                     if not os.path.exists(cover_path):
-                        success = self.service_clients.download_artist_image(artist, cover_path)
-                        if success:
-                            self.logger.info(f"Downloaded artist image: {cover_path}")
-                        else:
-                            self.logger.warning(f"Failed to download artist image for {artist.title}")
+                        self.scheduler.submit(
+                            self.download_type, f"image of {artist.title}", artist_path, None,
+                            lambda throttle, artist=artist, cover_path=cover_path: self._transfer_image(
+                                cover_path, throttle, lambda: self.service_clients.download_artist_image(artist, cover_path)
+                            )
+                        )
                     else:
                         self.logger.info(f"Artist image already exists: {cover_path}")
                     break  # We only need to download for the first matching artist
         except Exception as e:
             self.logger.error(f"Error downloading artist image for {artist_name}: {str(e)}")
 
-    def _get_album_path(self, album):
+    def _get_album_path(self, album, first_track=None):
         """Get the correct album path based on Plex metadata."""
         try:
-            # Get the full file path of the first track in the album
-            first_track = album.tracks()[0]
-            full_path = first_track.media[0].parts[0].file.replace('\\', '/')
-            
-            # Remove the prefix '/share/NFSv=4/Media/Music/Album'
-            relative_path = full_path.split('/Album/')[-1]
-            
-            # Split the path to get artist and album name
-            path_parts = relative_path.split('/')
-            artist_name = path_parts[0]
-            album_name = path_parts[1]
-            
-            # Construct the full album path
-            return os.path.join(self.music_library, artist_name, album_name).replace('\\', '/')
+            return self.path_mapper.album_path(album, first_track)
         except Exception as e:
             self.logger.error(f"Error getting album path for {album.title}: {str(e)}")
             # Fallback to a basic path if there's an error
             return os.path.join(self.music_library, album.parentTitle, album.title).replace('\\', '/')
 
+    def _get_track_album_path(self, track):
+        """Get the album path of a track without fetching its album from Plex."""
+        try:
+            return self.path_mapper.album_path_for_track(track)
+        except Exception as e:
+            self.logger.error(f"Error getting album path for track {track.title}: {str(e)}")
+            return os.path.join(self.music_library, track.grandparentTitle, track.parentTitle).replace('\\', '/')
+
     @staticmethod
     def _sanitize_filename(filename):
         """Remove invalid characters from filename."""
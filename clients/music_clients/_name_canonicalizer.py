@@ -0,0 +1,227 @@
+# clients/music_clients/_name_canonicalizer.py
+
+import json
+import os
+import re
+from collections import Counter
+from unidecode import unidecode
+from utils.logger import SingletonLogger
+
+LEADING_ARTICLE = re.compile(r'^(the|a|an)\s+')
+NON_WORD = re.compile(r'[^\w\s]+')
+WHITESPACE = re.compile(r'\s+')
+# Digits are split from letters, since removing punctuation turns 'No.5' into 'no5'
+NUMBER_TOKEN = re.compile(r'\d+|[^\W\d]+')
+# Roman numerals up to 399; m and d are left out so words like 'mix' or 'did' never count
+ROMAN_NUMERAL = re.compile(r'^(?=[ivxlc])(c{0,3})(xc|xl|l?x{0,3})(ix|iv|v?i{0,3})$')
+ROMAN_VALUES = {'i': 1, 'v': 5, 'x': 10, 'l': 50, 'c': 100}
+NUMBER_WORDS = {'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10}
+# Spelled-out numbers only count after one of these, so 'Vol One' matches 'Vol 1' but 'One' stays a word
+NUMBER_MARKERS = ('vol', 'volume', 'no', 'number', 'part', 'pt', 'cd', 'disc', 'disk')
+
+
+def normalize_name(name):
+    """Reduce a name to the key used for matching: ASCII, lower case, no punctuation or leading article."""
+    key = unidecode(name).casefold().replace('&', ' and ')
+    key = NON_WORD.sub('', key)
+    key = WHITESPACE.sub(' ', key).strip()
+    return LEADING_ARTICLE.sub('', key)
+
+
+def _roman_value(token):
+    values = [ROMAN_VALUES[char] for char in token]
+    return sum(-value if index + 1 < len(values) and value < values[index + 1] else value
+               for index, value in enumerate(values))
+
+
+def number_tokens(key):
+    """
+    Numbers in a normalized name: digits, Roman numerals and spelled-out numbers after Vol/No/Part/CD.
+
+    'Symphony No. 5' and 'Symphony No. 6', or 'Led Zeppelin II' and 'Led Zeppelin III',
+    score far above any useful threshold, so names with different numbers are never merged.
+    """
+    tokens = NUMBER_TOKEN.findall(key)
+    numbers = []
+    for index, token in enumerate(tokens):
+        if token.isdigit():
+            numbers.append(int(token))
+        elif ROMAN_NUMERAL.match(token):
+            numbers.append(_roman_value(token))
+        elif token in NUMBER_WORDS and index and tokens[index - 1] in NUMBER_MARKERS:
+            numbers.append(NUMBER_WORDS[token])
+    return tuple(numbers)
+
+
+def _spelling_rank(name, counts, key_counts):
+    """
+    Sort key choosing a cluster's canonical spelling; lower is better.
+
+    The most common normalized form wins, then the most common spelling of it.
+    Ties go to the richer spelling: diacritics and punctuation ('Björk', 'AC/DC')
+    beat their stripped forms, and longer beats shorter, since typos usually drop letters.
+    """
+    non_ascii = sum(not char.isascii() for char in name)
+    punctuation = sum(not char.isalnum() and not char.isspace() for char in name)
+    return (-key_counts[normalize_name(name)], -counts[name], -non_ascii, -punctuation, -len(name.strip()), name)
+
+
+class NameCanonicalizer:
+    """
+    Clusters spelling variants of artist and album names into a persistent alias map.
+
+    Names are normalized first so trivial variants collapse without scoring.
+    The remaining keys are scored with rapidfuzz's process.cdist in blocks of
+    rows against the rest of the list, which keeps memory bounded and all pair
+    scoring in native code; only pairs above the threshold reach Python.
+    Albums are clustered per artist and stored under the artist's folder name.
+    """
+    def __init__(self, config, logger=None):
+        self.logger = logger or SingletonLogger.get_logger()
+        options = config.get('canonicalization', {})
+        self.alias_file = options.get('alias_file', 'config/aliases.json')
+        self.threshold = options.get('threshold', 92)
+        self.block_size = options.get('block_size', 1024)
+        self.aliases = self._load()
+
+    def _load(self):
+        try:
+            with open(self.alias_file, 'r', encoding='utf-8') as f:
+                aliases = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            self.logger.warning(f"Ignoring unreadable alias file {self.alias_file}: {str(e)}")
+            return {}
+        albums = aliases.get('albums', {})
+        if any(isinstance(value, str) for value in albums.values()):
+            # Library-wide album aliases from before albums were clustered per artist
+            self.logger.warning(f"Dropping {len(albums)} library-wide album aliases from {self.alias_file}")
+            aliases['albums'] = {}
+        return aliases
+
+    def save(self):
+        directory = os.path.dirname(self.alias_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.alias_file}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.aliases, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(temp_path, self.alias_file)
+
+    def canonical(self, name, kind='artists', artist=None):
+        """
+        Canonical spelling of a name; names never clustered are returned unchanged.
+
+        :param artist: Artist folder an album belongs to; required for kind 'albums'
+        """
+        aliases = self.aliases.get(kind, {})
+        if artist is not None:
+            aliases = aliases.get(artist, {})
+        return aliases.get(name, name)
+
+    def same_name(self, first, second, kind='artists', artist=None):
+        """Whether two names refer to the same artist/album after canonicalization."""
+        return (normalize_name(self.canonical(first, kind, artist))
+                == normalize_name(self.canonical(second, kind, artist)))
+
+    def update(self, names, kind='artists'):
+        """
+        Cluster names and merge the result into the alias map for kind.
+
+        Existing aliases are kept so manual corrections in the alias file survive,
+        unless variant and canonical name contain different numbers.
+        Returns the number of variants mapped to a different canonical spelling.
+        """
+        counts = Counter(names)
+        mapped = self._merge(counts, self.aliases.setdefault(kind, {}))
+        self.logger.info(f"Canonicalized {len(counts)} {kind}: {mapped} new aliases")
+        return mapped
+
+    def update_albums(self, albums_by_artist):
+        """Cluster album names within each artist; albums of different artists are never compared."""
+        album_aliases = self.aliases.setdefault('albums', {})
+        mapped = total = 0
+        for artist, albums in albums_by_artist.items():
+            counts = Counter(albums)
+            total += len(counts)
+            aliases = album_aliases.get(artist, {})
+            mapped += self._merge(counts, aliases)
+            if aliases:
+                album_aliases[artist] = aliases
+            else:
+                album_aliases.pop(artist, None)
+        self.logger.info(f"Canonicalized {total} albums of {len(albums_by_artist)} artists: {mapped} new aliases")
+        return mapped
+
+    def _merge(self, counts, aliases):
+        """Cluster the names in counts and add new variant -> canonical entries to aliases."""
+        for variant, canonical in list(aliases.items()):
+            if number_tokens(normalize_name(variant)) != number_tokens(normalize_name(canonical)):
+                self.logger.warning(f"Dropping alias '{variant}' -> '{canonical}': their numbers differ")
+                del aliases[variant]
+
+        by_key = {}
+        for name in counts:
+            by_key.setdefault(normalize_name(name), []).append(name)
+        keys = list(by_key)
+        numbers = [number_tokens(key) for key in keys]
+
+        parent = list(range(len(keys)))
+
+        def find(index):
+            while parent[index] != index:
+                parent[index] = parent[parent[index]]
+                index = parent[index]
+            return index
+
+        for first, second in self._similar_pairs(keys):
+            if numbers[first] != numbers[second]:
+                continue
+            root_first, root_second = find(first), find(second)
+            if root_first != root_second:
+                parent[root_second] = root_first
+
+        clusters = {}
+        for index in range(len(keys)):
+            clusters.setdefault(find(index), []).append(index)
+
+        from rapidfuzz import fuzz
+
+        mapped = 0
+        for members in clusters.values():
+            variants = [name for index in members for name in by_key[keys[index]]]
+            if len(variants) < 2:
+                continue
+            key_counts = {keys[index]: sum(counts[name] for name in by_key[keys[index]]) for index in members}
+            canonical = min(variants, key=lambda variant: _spelling_rank(variant, counts, key_counts))
+            # An existing (possibly manual) alias of the chosen spelling takes precedence
+            canonical = aliases.get(canonical, canonical)
+            canonical_key = normalize_name(canonical)
+            for index in members:
+                # Union-find links chains of similar names; only keep those close to the canonical one itself
+                if keys[index] != canonical_key and fuzz.ratio(keys[index], canonical_key) < self.threshold:
+                    continue
+                for variant in by_key[keys[index]]:
+                    if variant != canonical and variant not in aliases:
+                        aliases[variant] = canonical
+                        mapped += 1
+        return mapped
+
+    def _similar_pairs(self, keys):
+        """Yield index pairs (i < j) of keys scoring at least the threshold."""
+        import numpy as np
+        from rapidfuzz import fuzz, process
+
+        for start in range(0, len(keys), self.block_size):
+            end = min(start + self.block_size, len(keys))
+            # Only compare against keys from this block onwards: the lower triangle was done earlier
+            scores = process.cdist(
+                keys[start:end], keys[start:], scorer=fuzz.ratio,
+                score_cutoff=self.threshold, dtype=np.uint8, workers=-1
+            )
+            rows, cols = np.nonzero(scores)
+            rows += start
+            cols += start
+            upper = rows < cols
+            yield from zip(rows[upper].tolist(), cols[upper].tolist())
\ No newline at end of file
@@ -0,0 +1,68 @@
+# clients/music_clients/_path_mapper.py
+
+import os
+import re
+from utils.logger import SingletonLogger
+
+# Used when no [path-mapping] rules are configured: everything after '/Album/' on the server
+DEFAULT_RULES = ({'remote': r'.*/Album/', 'regex': True},)
+
+
+class PathMapper:
+    """
+    Translates file paths reported by Plex into local album folders.
+
+    Rules map a remote prefix to a local prefix and are compiled once. Album
+    folders are memoized per album ratingKey, so a playlist resolves each album
+    once from the track's own file path instead of fetching album and tracks.
+    """
+    def __init__(self, config, logger=None):
+        self.logger = logger or SingletonLogger.get_logger()
+        options = config.get('path-mapping', {})
+        music_library = config['directories']['music_library'].replace('\\', '/')
+        self.album_depth = options.get('album-depth', 2)
+        self.rules = [
+            (self._compile(rule), rule.get('local', music_library).replace('\\', '/'))
+            for rule in (options.get('rules') or DEFAULT_RULES)
+        ]
+        self.music_library = music_library
+        self._album_paths = {}
+
+    @staticmethod
+    def _compile(rule):
+        remote = rule['remote'].replace('\\', '/')
+        return re.compile(remote if rule.get('regex', False) else re.escape(remote.rstrip('/') + '/'))
+
+    def map_path(self, remote_path):
+        """Return (local prefix, remainder) for the first matching rule, or None."""
+        remote_path = remote_path.replace('\\', '/')
+        for pattern, local in self.rules:
+            match = pattern.match(remote_path)
+            if match:
+                return local, remote_path[match.end():]
+        return None
+
+    def album_path(self, album, first_track=None):
+        """Local folder of a Plex album; first_track avoids fetching the album's tracks."""
+        key = album.ratingKey
+        if key not in self._album_paths:
+            track = first_track if first_track is not None else album.tracks()[0]
+            self._album_paths[key] = self._resolve(track.media[0].parts[0].file, album.parentTitle, album.title)
+        return self._album_paths[key]
+
+    def album_path_for_track(self, track):
+        """Local album folder of a track, resolved from the track's own file path."""
+        key = track.parentRatingKey
+        if key not in self._album_paths:
+            self._album_paths[key] = self._resolve(track.media[0].parts[0].file, track.grandparentTitle, track.parentTitle)
+        return self._album_paths[key]
+
+    def _resolve(self, remote_file, artist_title, album_title):
+        mapped = self.map_path(remote_file)
+        if mapped:
+            local, remainder = mapped
+            parts = remainder.split('/')
+            if len(parts) > self.album_depth:
+                return '/'.join([local.rstrip('/')] + parts[:self.album_depth])
+        self.logger.error(f"No path mapping rule matches {remote_file}, falling back to Plex titles")
+        return os.path.join(self.music_library, artist_title, album_title).replace('\\', '/')
\ No newline at end of file
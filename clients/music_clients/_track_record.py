@@ -0,0 +1,84 @@
+# clients/music_clients/_track_record.py
+
+import os
+import sys
+
+_intern = sys.intern
+
+
+class TrackRecord:
+    """
+    Compact, detached description of one track shared between stages.
+
+    Stages pass these instead of plexapi Track objects: no per-instance dict,
+    repeated strings (directory, artist, album, format) are interned so 100k
+    records share them, and reading a field can never trigger a Plex reload.
+    The path is stored as an interned directory plus a filename.
+    """
+    __slots__ = ('directory', 'filename', 'size', 'mtime', 'duration', 'rating_key',
+                 'format', 'artist', 'album', 'title', 'part_key')
+
+    def __init__(self, path, size=0, mtime=0, duration=0, rating_key=None, format='',
+                 artist='', album='', title='', part_key=None):
+        directory, self.filename = os.path.split(path)
+        self.directory = _intern(directory)
+        self.size = size
+        self.mtime = mtime
+        self.duration = duration
+        self.rating_key = rating_key
+        self.format = _intern(format)
+        self.artist = _intern(artist)
+        self.album = _intern(album)
+        self.title = title
+        self.part_key = part_key
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, self.filename)
+
+    @classmethod
+    def from_plex(cls, track, path=None):
+        """
+        Snapshot a plexapi Track, reading each attribute once.
+
+        :param path: Local path of the track; defaults to the file path Plex reports
+        """
+        media = track.media[0]
+        part = media.parts[0]
+        return cls(
+            path or part.file,
+            size=part.size or 0,
+            duration=track.duration or 0,
+            rating_key=int(track.ratingKey),
+            format=media.container or '',
+            artist=track.grandparentTitle or '',
+            album=track.parentTitle or '',
+            title=track.title or '',
+            part_key=part.key,
+        )
+
+    @classmethod
+    def from_file(cls, path):
+        """Record for a file on disk; duration is left at 0 until a stage measures it."""
+        stat = os.stat(path)
+        directory = os.path.dirname(path)
+        return cls(
+            path,
+            size=stat.st_size,
+            mtime=stat.st_mtime_ns,
+            format=os.path.splitext(path)[1].lstrip('.').lower(),
+            artist=os.path.basename(os.path.dirname(directory)),
+            album=os.path.basename(directory),
+        )
+
+    def __repr__(self):
+        return f"TrackRecord({self.path!r}, size={self.size}, rating_key={self.rating_key})"
+
+
+def scan_library(roots, extensions):
+    """Yield a TrackRecord for every file under roots whose extension is in extensions."""
+    for root in roots:
+        for directory, _, files in os.walk(root):
+            for name in files:
+                if os.path.splitext(name)[1].lower() in extensions:
+                    yield TrackRecord.from_file(os.path.join(directory, name))
\ No newline at end of file
@@ -1,35 +1,66 @@
 # clients/music_clients/music_clients.py
 
-from utils import SingletonLogger, ConfigReader, CredentialHandler
-from ..service_clients.service_clients import ServiceClients
-from ._music_downloader import MusicDownloader
-from ._duplicate_finder import DuplicateFinder
-from ._duplicate_deletion import DuplicateDeletion
-from ._empty_deletion import EmptyDeletion
-from ._loudness_data_analyzer import LoudnessDataAnalyzer
-from ._metadata_setter import MetadataSetter
+import importlib
+import os
+from utils import SingletonLogger, Settings, Shard, RunJournal
+
+# Attribute -> (module, class). Components are imported and built on first access,
+# so a run only pays for the stages and services its config actually enables.
+COMPONENT_REGISTRY = {
+    'service_clients': ('..service_clients.service_clients', 'ServiceClients'),
+    'music_downloader': ('._music_downloader', 'MusicDownloader'),
+    'duplicate_finder': ('._duplicate_finder', 'DuplicateFinder'),
+    'duplicate_deletion': ('._duplicate_deletion', 'DuplicateDeletion'),
+    'empty_deletion': ('._empty_deletion', 'EmptyDeletion'),
+    'loudness_analyzer': ('._loudness_data_analyzer', 'LoudnessDataAnalyzer'),
+    'metadata_setter': ('._metadata_setter', 'MetadataSetter'),
+    'lossy_mirror': ('._lossy_mirror', 'LossyMirror'),
+    'library_watcher': ('._library_watcher', 'LibraryWatcher'),
+}
+
+# Stage name -> (config section, enabled flag), in the order process_music runs them
+STAGES = {
+    'download': ('music-download', 'music-download'),
+    'dedupe': ('duplicate_deletion', 'enabled'),
+    'clean': ('empty_deletion', 'enabled'),
+    'loudness': ('loudness_analysis', 'enabled'),
+    'tag': ('metadata_setting', 'enabled'),
+    'mirror': ('lossy_mirror', 'enabled'),
+}
+
+# Stages whose work splits cleanly by album folder. The others write state shared
+# across albums (alias file, mirror manifest, artist folders) and only run unsharded.
+SHARDABLE_STAGES = ('download', 'dedupe', 'loudness')
 
 class MusicClient:
-    def __init__(self):
+    def __init__(self, settings=None):
         self.logger = SingletonLogger.get_logger()
         self.logger.info("Initializing Music Client...")
         
-        config_reader = ConfigReader()
-        self.config = config_reader.read_config()
+        self.settings = settings or Settings.get_settings()
+        self.config = self.settings.config
+        self.credentials = self.settings.credentials
         self._log_config_details()
-        
-        credential_handler = CredentialHandler()
-        self.credentials = credential_handler.get_credentials()
-        self.logger.info("Credentials loaded successfully")
-        
-        self.service_clients = ServiceClients()
-        
-        self.music_downloader = MusicDownloader(self.service_clients, self.config, self.logger)
-        self.duplicate_finder = DuplicateFinder(self.config)
-        self.duplicate_deletion = DuplicateDeletion(self.config)
-        self.empty_deletion = EmptyDeletion(self.config)
-        self.loudness_analyzer = LoudnessDataAnalyzer(self.config)
-        self.metadata_setter = MetadataSetter(self.config)
+
+    def __getattr__(self, name):
+        """Import and build a registered component the first time it is accessed."""
+        if name not in COMPONENT_REGISTRY:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        module_name, class_name = COMPONENT_REGISTRY[name]
+        self.logger.debug(f"Loading {class_name} from {module_name}")
+        component_class = getattr(importlib.import_module(module_name, __package__), class_name)
+
+        if name == 'service_clients':
+            component = component_class(self.settings)
+        elif name == 'music_downloader':
+            component = component_class(self.service_clients, self.config, self.logger)
+        elif name == 'library_watcher':
+            component = component_class(self.config, self.logger)
+        else:
+            component = component_class(self.config)
+
+        setattr(self, name, component)
+        return component
 
     def _log_config_details(self):
         self.logger.info("Configuration details:")
@@ -49,50 +80,156 @@ class MusicClient:
             self.logger.info(f"Loudness analysis enabled: {self.config['loudness_analysis'].get('enabled', False)}")
         if 'metadata_setting' in self.config:
             self.logger.info(f"Metadata setting enabled: {self.config['metadata_setting'].get('enabled', False)}")
+        if 'lossy_mirror' in self.config:
+            self.logger.info(f"Lossy mirror enabled: {self.config['lossy_mirror'].get('enabled', False)}")
+
+    def is_stage_enabled(self, stage):
+        section, flag = STAGES[stage]
+        return self.config.get(section, {}).get(flag, False)
 
-    def process_music(self):
+    def process_music(self, stages=None, target_names=None, shard=None, resume=False):
+        """
+        Run processing stages in order, recording finished work in the run journal.
+
+        :param stages: Stage names to run; defaults to every stage enabled in config
+        :param target_names: Only download these targets from the targets file
+        :param shard: Shard handled by this process; stages outside SHARDABLE_STAGES are skipped when sharded
+        :param resume: Skip work the previous run's journal marks as done and retry its failures
+        """
+        # Each stage selection and shard keeps its own journal, so e.g. a cron 'clean'
+        # never truncates the journal an interrupted full run will resume from
+        suffixes = []
+        if stages is not None:
+            suffixes.append('-'.join(stage for stage in STAGES if stage in stages))
+        if shard and shard.count > 1:
+            suffixes.append(f"shard{shard.index}of{shard.count}")
+        journal = RunJournal.open(self.config, resume, '.'.join(suffixes))
         try:
-            self.logger.info("Starting music processing...")
-            
-            # Download music
-            if self.config['music-download'].get('music-download', False):
-                download_type = self.config['music-download']['download-object']
-                targets = self._get_targets(download_type)
-                self.logger.info(f"Downloading music. Type: {download_type}, Targets: {targets}")
-                self.music_downloader.download_music(download_type, targets)
-            else:
-                self.logger.info("Music download is disabled in config. Skipping download process.")
-            
-            # Other processing steps
-            if self.config.get('duplicate_deletion', {}).get('enabled', False):
-                self.logger.info("Starting duplicate detection and deletion...")
-                self.duplicate_finder.find_duplicates()
-                self.duplicate_deletion.delete_duplicates()
-            
-            if self.config.get('empty_deletion', {}).get('enabled', False):
-                self.logger.info("Starting empty folder deletion...")
-                self.empty_deletion.delete_empty_folders()
-            
-            if self.config.get('loudness_analysis', {}).get('enabled', False):
-                self.logger.info("Starting loudness analysis...")
-                self.loudness_analyzer.analyze_loudness()
-            
-            if self.config.get('metadata_setting', {}).get('enabled', False):
-                self.logger.info("Starting metadata setting...")
-                self.metadata_setter.set_metadata()
-            
+            self.logger.info(f"Starting music processing{' (resuming)' if resume else ''}...")
+            if stages is None:
+                stages = [stage for stage in STAGES if self.is_stage_enabled(stage)]
+                for stage in STAGES:
+                    if stage not in stages:
+                        self.logger.info(f"Stage '{stage}' is disabled in config. Skipping.")
+
+            for stage in STAGES:
+                if stage not in stages:
+                    continue
+                if journal.is_done(stage):
+                    self.logger.info(f"Stage '{stage}' completed in a previous run. Skipping.")
+                    continue
+                if shard and shard.count > 1 and stage not in SHARDABLE_STAGES:
+                    self.logger.warning(f"Stage '{stage}' cannot be sharded. Skipping; run it without --shard.")
+                    continue
+                try:
+                    self.run_stage(stage, target_names, shard)
+                except Exception as e:
+                    journal.record(stage, '*', 'failed', str(e))
+                    raise
+                if not journal.complete_stage(stage):
+                    self.logger.warning(f"Stage '{stage}' finished with failures; rerun with --resume to retry them")
+
             self.logger.info("Music processing completed successfully.")
         except Exception as e:
             self.logger.error(f"An error occurred during music processing: {str(e)}")
+        finally:
+            journal.close()
+
+    def watch_library(self):
+        """
+        Run the library stages enabled in config on album folders as they change.
+
+        Downloading is left to scheduled runs; every settled batch of changed
+        albums goes through dedupe, loudness, tag, mirror and clean in that order.
+        Each batch gets a fresh journal, and the events the stages cause in the
+        batch's own albums are discarded so they do not queue those albums again.
+        """
+        stages = [stage for stage in ('dedupe', 'loudness', 'tag', 'mirror', 'clean') if self.is_stage_enabled(stage)]
+        self.logger.info(f"Watch mode started. Stages: {stages}")
+        watcher = self.library_watcher
+        try:
+            for albums in watcher.batches():
+                self.logger.info(f"Processing {'the whole library' if albums is None else f'{len(albums)} changed albums'}")
+                journal = RunJournal.open(self.config, suffix='watch')
+                try:
+                    for stage in stages:
+                        try:
+                            self.run_stage(stage, paths=albums)
+                        except Exception as e:
+                            self.logger.error(f"Stage '{stage}' failed in watch mode: {str(e)}")
+                finally:
+                    journal.close()
+                    watcher.discard(albums)
+        except KeyboardInterrupt:
+            self.logger.info("Watch mode stopped")
+        finally:
+            watcher.close()
+
+    def run_stage(self, stage, target_names=None, shard=None, paths=None):
+        """
+        Run a single stage.
+
+        :param shard: Shard handled by this process; library stages only process the album folders it owns
+        :param paths: Album folders to limit library stages to; None means the whole library
+        """
+        if shard and shard.count > 1 and stage != 'download':
+            if stage not in SHARDABLE_STAGES:
+                raise ValueError(f"Stage '{stage}' cannot be sharded")
+            paths = self._shard_paths(shard, paths)
+            self.logger.info(f"Shard {shard} owns {len(paths)} album folders")
+            if not paths:
+                return
+        if stage == 'download':
+            download_types = self.config['music-download']['download-object']
+            if isinstance(download_types, str):
+                download_types = [download_types]
+            # Queue everything first so the scheduler can order playlists before discographies
+            for download_type in download_types:
+                targets = self._get_targets(download_type, target_names)
+                self.logger.info(f"Queueing music. Type: {download_type}, Shard: {shard or Shard()}, Targets: {targets}")
+                self.music_downloader.queue_music(download_type, targets, shard)
+            self.music_downloader.run_queue()
+        elif stage == 'dedupe':
+            self.logger.info("Starting duplicate detection and deletion...")
+            self.duplicate_finder.find_duplicates(paths)
+            self.duplicate_deletion.delete_duplicates(paths)
+        elif stage == 'clean':
+            self.logger.info("Starting empty folder deletion...")
+            self.empty_deletion.delete_empty_folders(paths)
+        elif stage == 'loudness':
+            self.logger.info("Starting loudness analysis...")
+            self.loudness_analyzer.analyze_loudness(paths)
+        elif stage == 'tag':
+            self.logger.info("Starting metadata setting...")
+            self.metadata_setter.set_metadata(paths)
+        elif stage == 'mirror':
+            self.logger.info("Starting lossy mirror update...")
+            self.lossy_mirror.mirror_library(paths)
+        else:
+            raise ValueError(f"Unknown stage: {stage}")
 
-    def _get_targets(self, download_type):
+    def _shard_paths(self, shard, paths=None):
+        """Album folders owned by shard, keyed like the downloader's by their path relative to music_library."""
+        music_library = self.config['directories']['music_library']
+        if paths is None:
+            paths = [music_library]
+            for _ in range(self.config.get('path-mapping', {}).get('album-depth', 2)):
+                paths = [entry.path for folder in paths for entry in os.scandir(folder) if entry.is_dir()]
+        return [path for path in paths if shard.owns(os.path.relpath(path, music_library).replace('\\', '/'))]
+
+    def _get_targets(self, download_type, target_names=None):
         """Read targets from the appropriate file based on download type."""
         file_path = f'targets/{"artists" if download_type == "artist" else "playlists"}.txt'
         try:
             with open(file_path, 'r') as f:
                 targets = [line.strip() for line in f if line.strip()]
             self.logger.info(f"Read {len(targets)} targets from {file_path}")
-            return targets
         except Exception as e:
             self.logger.error(f"Error reading targets from {file_path}: {str(e)}")
-            return []
\ No newline at end of file
+            return []
+
+        if target_names:
+            wanted = {name.strip().casefold() for name in target_names}
+            targets = [target for target in targets if target.casefold() in wanted]
+            self.logger.info(f"Filtered to {len(targets)} targets matching {sorted(target_names)}")
+        return targets
\ No newline at end of file
@@ -1,13 +1,14 @@
 # clients/service_clients/acoustid_client.py
 
 import acoustid
-from utils import SingletonLogger, ConfigReader, CredentialHandler
+from utils import SingletonLogger, Settings
 
 class AcoustIDClient:
-    def __init__(self):
+    def __init__(self, settings=None):
         self.logger = SingletonLogger.get_logger()
-        self.config = ConfigReader().read_config()
-        self.credentials = CredentialHandler().get_service_credentials('acoustid')
+        settings = settings or Settings.get_settings()
+        self.config = settings.config
+        self.credentials = settings.get_service_credentials('acoustid')
         self.api_key = self.credentials['api_key']
 
     def fingerprint_file(self, file_path):
@@ -1,13 +1,14 @@
 # clients/service_clients/google_images_client.py
 
 import requests
-from utils import SingletonLogger, ConfigReader, CredentialHandler
+from utils import SingletonLogger, Settings
 
 class GoogleImagesClient:
-    def __init__(self):
+    def __init__(self, settings=None):
         self.logger = SingletonLogger.get_logger()
-        self.config = ConfigReader().read_config()
-        self.credentials = CredentialHandler().get_service_credentials('google_images')
+        settings = settings or Settings.get_settings()
+        self.config = settings.config
+        self.credentials = settings.get_service_credentials('google_images')
         self.search_engine_id = self.credentials['search_engine_id']
         self.api_key = self.credentials['api_key']
 
@@ -1,13 +1,14 @@
 # clients/service_clients/musicbrainz_client.py
 
 import musicbrainzngs
-from utils import SingletonLogger, ConfigReader, CredentialHandler
+from utils import SingletonLogger, Settings
 
 class MusicBrainzClient:
-    def __init__(self):
+    def __init__(self, settings=None):
         self.logger = SingletonLogger.get_logger()
-        self.config = ConfigReader().read_config()
-        self.credentials = CredentialHandler().get_service_credentials('musicbrainz')
+        settings = settings or Settings.get_settings()
+        self.config = settings.config
+        self.credentials = settings.get_service_credentials('musicbrainz')
         self._setup_musicbrainz()
 
     def _setup_musicbrainz(self):
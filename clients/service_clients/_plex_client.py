@@ -1,5 +1,7 @@
 # clients/service_clients/_plex_client.py
 
+import os
+import requests
 from plexapi.server import PlexServer
 from utils import SingletonLogger
 
@@ -52,6 +54,35 @@ class PlexClient:
             self.logger.error(f"Error downloading track '{track.title}': {str(e)}")
             raise
 
+    def stream_track(self, track, save_dir, throttle=None, chunk_size=64 * 1024):
+        """
+        Download a track under its original filename, pacing reads through throttle.
+
+        track is a TrackRecord snapshot, so no Plex object is kept alive while
+        the transfer waits in a queue. The file is written to a '.part' sibling
+        first and renamed when complete, so an interrupted transfer never leaves
+        a truncated track behind.
+        """
+        file_path = os.path.join(save_dir, track.filename)
+        temp_path = f"{file_path}.part"
+        try:
+            os.makedirs(save_dir, exist_ok=True)
+            url = self.server.url(f"{track.part_key}?download=1", includeToken=True)
+            with requests.get(url, stream=True, timeout=60) as response:
+                response.raise_for_status()
+                with open(temp_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size):
+                        if throttle is not None:
+                            throttle.consume(len(chunk))
+                        f.write(chunk)
+            os.replace(temp_path, file_path)
+            return file_path
+        except Exception as e:
+            self.logger.error(f"Error streaming track '{track.title}': {str(e)}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
     def download_album_cover(self, album, save_path):
         """Download album cover to the specified path."""
         try:
@@ -1,13 +1,14 @@
 # clients/service_clients/youtube_client.py
 
 from googleapiclient.discovery import build
-from utils import SingletonLogger, ConfigReader, CredentialHandler
+from utils import SingletonLogger, Settings
 
 class YouTubeClient:
-    def __init__(self):
+    def __init__(self, settings=None):
         self.logger = SingletonLogger.get_logger()
-        self.config = ConfigReader().read_config()
-        self.credentials = CredentialHandler().get_service_credentials('youtube')
+        settings = settings or Settings.get_settings()
+        self.config = settings.config
+        self.credentials = settings.get_service_credentials('youtube')
         self.youtube = self._setup_youtube()
 
     def _setup_youtube(self):
@@ -1,15 +1,20 @@
 # clients/service_clients/service_clients.py
 
-from utils import SingletonLogger, ConfigReader, CredentialHandler
-from ._plex_client import PlexClient
-import requests
+import importlib
+from utils import SingletonLogger, Settings, UnitInterrupted
+
+# Client name -> (module, class); modules are imported only when a client is first used
+CLIENT_REGISTRY = {
+    'plex': ('._plex_client', 'PlexClient'),
+}
 
 class ServiceClients:
-    def __init__(self):
+    def __init__(self, settings=None):
         """Initialize ServiceClients with logger, config, and credentials."""
         self.logger = SingletonLogger.get_logger()
-        self.config = ConfigReader().read_config()
-        self.credentials = CredentialHandler().get_credentials()
+        self.settings = settings or Settings.get_settings()
+        self.config = self.settings.config
+        self.credentials = self.settings.credentials
         self.plex = None
 
     def initialize_client(self, client_name):
@@ -19,11 +24,12 @@ class ServiceClients:
         :param client_name: Name of the client to initialize
         """
         try:
-            if client_name == 'plex':
-                self.logger.info("Initializing Plex client")
-                self.plex = PlexClient(self.config, self.credentials)
-            else:
+            if client_name not in CLIENT_REGISTRY:
                 raise ValueError(f"Unknown client: {client_name}")
+            module_name, class_name = CLIENT_REGISTRY[client_name]
+            self.logger.info(f"Initializing {class_name}")
+            client_class = getattr(importlib.import_module(module_name, __package__), class_name)
+            setattr(self, client_name, client_class(self.config, self.credentials))
            
             self.logger.info(f"Initialized {client_name} client successfully")
         except Exception as e:
@@ -68,22 +74,29 @@ class ServiceClients:
         self.logger.debug(f"Retrieved playlist: {playlist}")
         return playlist
 
-    def download_track(self, track, album_path, keep_original_name=True):
+    def download_track(self, track, album_path, keep_original_name=True, throttle=None):
         """
         Download a track from Plex.
 
-        :param track: Track object to download
+        :param track: Track object, or a detached track record (no download method), which is streamed
+            under its original filename
         :param album_path: Path to save the track
-        :param keep_original_name: Whether to keep the original filename
+        :param keep_original_name: Whether to keep the original filename of a Track object
+        :param throttle: Optional Throttle pacing a streamed record
         :return: True if download was successful, False otherwise
         """
         self.logger.debug(f"Attempting to download track: {track.title}")
         self.logger.debug(f"Album path: {album_path}")
         self.logger.debug(f"Keep original name: {keep_original_name}")
         try:
-            track.download(album_path, keep_original_name=keep_original_name)
+            if hasattr(track, 'download'):
+                track.download(album_path, keep_original_name=keep_original_name)
+            else:
+                self.get_client('plex').stream_track(track, album_path, throttle)
             self.logger.info(f"Successfully downloaded track: {track.title}")
             return True
+        except UnitInterrupted:
+            raise  # Stopped by the caller's throttle, e.g. a download window closing
         except Exception as e:
             self.logger.error(f"Failed to download track {track.title}: {str(e)}")
             return False
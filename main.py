@@ -1,31 +1,67 @@
 # main.py
 
 import sys
+import argparse
 import traceback
-from utils import SingletonLogger, ConfigReader, CredentialHandler
-from clients.music_clients.music_clients import MusicClient
+from utils import SingletonLogger, Settings, Shard
+from clients.music_clients.music_clients import MusicClient, STAGES, SHARDABLE_STAGES
 
-def main():
+def _shard_arg(value):
+    try:
+        return Shard.parse(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Download, clean up and tag a Plex music library.")
+    subparsers = parser.add_subparsers(dest='command')
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--target', action='append', dest='targets', metavar='NAME',
+                        help="Only download this artist/playlist from the targets file (repeatable); "
+                             "applies to the download stage only")
+    common.add_argument('--shard', type=_shard_arg, metavar='I/N',
+                        help="Process only shard I of N; shards never write to the same album folder. "
+                             f"Only {', '.join(SHARDABLE_STAGES)} can be sharded, 'run' skips the other stages")
+    common.add_argument('--resume', action='store_true',
+                        help="Skip work the last run's journal marks as done and retry what failed")
+
+    subparsers.add_parser('run', parents=[common], help="Run every stage enabled in config (default)")
+    for stage in STAGES:
+        subparsers.add_parser(stage, parents=[common], help=f"Run only the '{stage}' stage")
+    subparsers.add_parser('watch', help="Keep running and process albums as they change in music_library")
+
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or (argv[0].startswith('-') and argv[0] not in ('-h', '--help')):
+        argv.insert(0, 'run')  # Bare invocation keeps the old cron behaviour
+    args = parser.parse_args(argv)
+    if args.command in STAGES:
+        if args.targets and args.command != 'download':
+            parser.error(f"--target only applies to the download stage, not '{args.command}'")
+        if args.shard and args.shard.count > 1 and args.command not in SHARDABLE_STAGES:
+            parser.error(f"the '{args.command}' stage cannot be sharded; run it without --shard")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
     logger = SingletonLogger.get_logger()
     logger.info("Application started")
 
     try:
-        # Read configuration
-        config_reader = ConfigReader()
-        config = config_reader.read_config()
-        logger.info("Configuration loaded successfully")
-
-        # Get credentials
-        credential_handler = CredentialHandler()
-        credentials = credential_handler.get_credentials()
-        logger.info("Credentials loaded successfully")
+        # Read and validate configuration and credentials once
+        settings = Settings.get_settings()
+        logger.info("Configuration and credentials loaded successfully")
 
         # Initialize MusicClient
-        music_client = MusicClient()
+        music_client = MusicClient(settings)
         logger.info("MusicClient initialized")
 
         # Process music
-        music_client.process_music()
+        if args.command == 'watch':
+            music_client.watch_library()
+        else:
+            stages = None if args.command == 'run' else [args.command]
+            music_client.process_music(stages, args.targets, args.shard, args.resume)
         logger.info("Music processing completed")
 
     except Exception as e:
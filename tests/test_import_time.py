@@ -0,0 +1,51 @@
+# tests/test_import_time.py
+
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules a clean-only run must never import
+HEAVY_MODULES = ('plexapi', 'requests', 'numpy', 'rapidfuzz')
+IMPORT_BUDGET_SECONDS = 0.5
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main
+from utils import Settings
+from clients.music_clients.music_clients import MusicClient
+seconds = time.perf_counter() - started
+config = {
+    'directories': {'music_root': '.', 'music_library': sys.argv[1],
+                    'artwork_directory': 'artwork', 'playlists_directory': 'playlists'},
+    'music-download': {'music-download': False},
+    'empty_deletion': {'enabled': True},
+}
+MusicClient(Settings(config, {})).run_stage('clean')
+print(json.dumps({'seconds': seconds, 'modules': sorted(sys.modules)}))
+"""
+
+
+def _run_probe(tmp_path):
+    """Import main and run a clean-only config in a fresh interpreter working in tmp_path."""
+    library = tmp_path / 'library'
+    library.mkdir()
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE, str(library)],
+        cwd=tmp_path, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_clean_only_run_skips_heavy_imports(tmp_path):
+    result = _run_probe(tmp_path)
+    loaded = [name for name in HEAVY_MODULES if name in result['modules']]
+    assert not loaded, f"Clean-only run imported {', '.join(loaded)}"
+
+
+def test_import_main_within_budget(tmp_path):
+    result = _run_probe(tmp_path)
+    assert result['seconds'] <= IMPORT_BUDGET_SECONDS, f"Importing main took {result['seconds']:.3f}s"
\ No newline at end of file
@@ -0,0 +1,39 @@
+# tests/test_track_record_memory.py
+
+import tracemalloc
+from clients.music_clients._track_record import TrackRecord
+
+RECORD_COUNT = 100_000
+# Measured at about 475 bytes per track; the budget leaves room for interpreter differences
+BYTES_PER_TRACK_BUDGET = 600
+
+
+def _build_records(count):
+    """Records spread over a realistic layout: 12 tracks per album, 10 albums per artist."""
+    return [
+        TrackRecord(
+            f"/music/Album/Artist {index // 120}/Album {index // 12}/{index % 12 + 1:02d} - Track {index}.flac",
+            size=30_000_000 + index, mtime=1_700_000_000_000_000_000 + index, duration=240_000,
+            rating_key=index, format='flac', artist=f"Artist {index // 120}", album=f"Album {index // 12}",
+            title=f"Track {index}", part_key=f"/library/parts/{index}/1700000000/file.flac",
+        )
+        for index in range(count)
+    ]
+
+
+def test_records_stay_within_memory_budget():
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        records = _build_records(RECORD_COUNT)
+        used = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    per_track = used / len(records)
+    assert per_track <= BYTES_PER_TRACK_BUDGET, f"{len(records)} TrackRecords used {per_track:.0f} bytes per track"
+
+
+def test_repeated_strings_are_shared():
+    first, second = _build_records(2)
+    assert first.directory is second.directory
+    assert first.artist is second.artist and first.format is second.format
\ No newline at end of file
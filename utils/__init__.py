@@ -2,5 +2,8 @@
 from .config_reader import ConfigReader
 from .credential_handler import CredentialHandler
 from .logger import SingletonLogger, log_with_exception
+from .settings import Settings
+from .shard import Shard
+from .run_journal import RunJournal, UnitInterrupted
 
-__all__ = ['ConfigReader', 'CredentialHandler', 'SingletonLogger', 'log_with_exception']
\ No newline at end of file
+__all__ = ['ConfigReader', 'CredentialHandler', 'SingletonLogger', 'log_with_exception', 'Settings', 'Shard', 'RunJournal', 'UnitInterrupted']
\ No newline at end of file
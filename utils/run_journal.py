@@ -0,0 +1,213 @@
+# utils/run_journal.py
+
+import functools
+import json
+import os
+import time
+
+class UnitInterrupted(Exception):
+    """Raised by a unit's work to stop it without counting an attempt; the caller runs it again later."""
+
+
+class RunJournal:
+    """
+    Append-only JSON-lines record of completed and failed work units per stage.
+
+    Lines are buffered and written with a single fsync per batch, so a crash
+    loses at most the last batch of units, which are then simply redone.
+    With resume, the previous journal is replayed: completed units are skipped
+    and failed ones are tried again. Those that fail again are retried per stage
+    in rounds sharing one exponentially growing delay; attempts from earlier runs
+    count towards max_attempts, so a unit that keeps failing is given up on.
+    """
+    _instance = None
+
+    def __init__(self, path=None, resume=False, batch_size=64, flush_interval=1.0,
+                 max_attempts=3, backoff_seconds=5, max_backoff_seconds=300):
+        self.path = path
+        self.resume = resume
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.done = set()
+        self.failed_attempts = {}
+        self.run_failed = {}
+        self.retries = {}
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._file = None
+
+        if path:
+            if resume:
+                self._replay()
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    @classmethod
+    def get_journal(cls):
+        """Journal of the current run; an in-memory journal if none was opened."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def open(cls, config, resume=False, suffix=''):
+        options = config.get('journal', {})
+        path = options.get('path', 'logs/journal.jsonl')
+        if suffix:
+            root, extension = os.path.splitext(path)
+            path = f"{root}.{suffix}{extension}"
+        cls._instance = cls(
+            path, resume,
+            batch_size=options.get('batch-size', 64),
+            max_attempts=options.get('max-attempts', 3),
+            backoff_seconds=options.get('backoff-seconds', 5),
+            max_backoff_seconds=options.get('max-backoff-seconds', 300),
+        )
+        return cls._instance
+
+    def _replay(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Torn final line from a crash
+                    key = (entry['stage'], entry['unit'])
+                    if entry['status'] == 'done':
+                        self.done.add(key)
+                        self.failed_attempts.pop(key, None)
+                    elif entry['status'] == 'failed':
+                        self.done.discard(key)
+                        self.failed_attempts[key] = self.failed_attempts.get(key, 0) + 1
+        except FileNotFoundError:
+            pass
+
+    def is_done(self, stage, unit='*'):
+        return (stage, unit) in self.done
+
+    def record(self, stage, unit, status, error=None):
+        key = (stage, unit)
+        if status == 'done':
+            self.done.add(key)
+            self.failed_attempts.pop(key, None)
+            self.run_failed.get(stage, set()).discard(unit)
+        else:
+            self.done.discard(key)
+            self.failed_attempts[key] = self.failed_attempts.get(key, 0) + 1
+            if unit != '*':
+                self.run_failed.setdefault(stage, set()).add(unit)
+        if self._file is None:
+            return
+        entry = {'stage': stage, 'unit': unit, 'status': status, 'time': time.time()}
+        if error:
+            entry['error'] = error
+        self._buffer.append(json.dumps(entry, ensure_ascii=False))
+        if len(self._buffer) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def run_unit(self, stage, unit, work, on_done=None):
+        """
+        Run work() once for a unit unless it already completed, without any delay.
+
+        work() failing means raising or returning False. A unit that also failed
+        in an earlier run and has attempts left is queued for retry_failed();
+        one failing for the first time waits for the next resume. on_done is
+        called once the unit is complete, including when it already was, now or
+        in a retry round. Returns True when the unit is complete now.
+        """
+        key = (stage, unit)
+        if key in self.done:
+            if on_done is not None:
+                on_done()
+            return True
+        previous_failures = self.failed_attempts.get(key, 0)
+        if previous_failures >= self.max_attempts:
+            self.run_failed.setdefault(stage, set()).add(unit)
+            return False
+        if self._attempt(stage, unit, work, on_done):
+            return True
+        if previous_failures and self.failed_attempts[key] < self.max_attempts:
+            self.retries.setdefault(stage, []).append((unit, work, on_done))
+        return False
+
+    def _attempt(self, stage, unit, work, on_done):
+        try:
+            if work() is not False:
+                self.record(stage, unit, 'done')
+                if on_done is not None:
+                    on_done()
+                return True
+            error = "reported failure"
+        except UnitInterrupted:
+            raise
+        except Exception as e:
+            error = str(e)
+        self.record(stage, unit, 'failed', error)
+        return False
+
+    def retry_failed(self, stage, run_round=None):
+        """
+        Retry the stage's failed units in rounds until they complete or run out of attempts.
+
+        Each round sleeps once, backoff_seconds doubling per round up to
+        max_backoff_seconds, then tries every queued unit. run_round, if given,
+        receives the round as (unit, retry) pairs and must call each retry(),
+        e.g. through a scheduler; by default they are called in order.
+        Returns the number completed.
+        """
+        completed = 0
+        round_number = 0
+        while self.retries.get(stage):
+            pending = self.retries.pop(stage)
+            self.flush()
+            time.sleep(min(self.backoff_seconds * 2 ** round_number, self.max_backoff_seconds))
+            round_number += 1
+            succeeded = []
+
+            def retry(unit, work, on_done):
+                if self._attempt(stage, unit, work, on_done):
+                    succeeded.append(unit)
+                    return True
+                if self.failed_attempts[(stage, unit)] < self.max_attempts:
+                    self.retries.setdefault(stage, []).append((unit, work, on_done))
+                return False
+
+            attempts = [(unit, functools.partial(retry, unit, work, on_done)) for unit, work, on_done in pending]
+            if run_round is None:
+                for _, attempt in attempts:
+                    attempt()
+            else:
+                run_round(attempts)
+            completed += len(succeeded)
+        return completed
+
+    def complete_stage(self, stage):
+        """Retry the stage's failed units, then mark it done if none of its units failed in this run."""
+        self.retry_failed(stage)
+        failures = len(self.run_failed.get(stage, ()))
+        if failures:
+            self.record(stage, '*', 'failed', f"{failures} units failed")
+        else:
+            self.record(stage, '*', 'done')
+        return not failures
+
+    def flush(self):
+        if self._file is None or not self._buffer:
+            return
+        self._file.write('\n'.join(self._buffer) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
\ No newline at end of file
@@ -0,0 +1,186 @@
+# utils/settings.py
+
+import os
+import re
+from types import MappingProxyType
+from .config_reader import ConfigReader
+from .credential_handler import CredentialHandler
+
+REQUIRED_DIRECTORIES = ('music_root', 'music_library', 'artwork_directory', 'playlists_directory')
+STAGE_SECTIONS = ('duplicate_deletion', 'empty_deletion', 'loudness_analysis', 'metadata_setting', 'lossy_mirror')
+DOWNLOAD_OBJECTS = ('artist', 'playlist')
+CLOCK_PATTERN = re.compile(r'^(([01]\d|2[0-3]):[0-5]\d|24:00)$')
+
+
+def _freeze(value):
+    """Recursively convert dicts and lists into read-only mappings and tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """Inverse of _freeze, used to pickle settings for worker processes."""
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+class Settings:
+    """Immutable, validated view of config.toml and credentials.toml.
+
+    Both files are parsed exactly once per process through get_settings();
+    every client receives this object instead of re-reading the files.
+    """
+    _instance = None
+
+    def __init__(self, config, credentials):
+        errors = self.validate(config)
+        if errors:
+            raise ValueError("Invalid configuration:\n  - " + "\n  - ".join(errors))
+        object.__setattr__(self, 'config', _freeze(config))
+        object.__setattr__(self, 'credentials', _freeze(credentials))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Settings are read-only")
+
+    def __reduce__(self):
+        # Rebuild from plain data so spawned workers never touch the files again
+        return (self.__class__, (_thaw(self.config), _thaw(self.credentials)))
+
+    @classmethod
+    def get_settings(cls, config_path='config/config.toml', credentials_path='config/credentials.toml'):
+        if cls._instance is None:
+            cls._instance = cls.load(config_path, credentials_path)
+        return cls._instance
+
+    @classmethod
+    def load(cls, config_path='config/config.toml', credentials_path='config/credentials.toml'):
+        config = ConfigReader(config_path).read_config()
+        credentials = CredentialHandler(credentials_path).get_credentials()
+        return cls(config, credentials)
+
+    @staticmethod
+    def validate(config):
+        """Return a list of human-readable problems found in the raw config."""
+        errors = []
+
+        directories = config.get('directories')
+        if not isinstance(directories, dict):
+            errors.append("Missing [directories] section")
+        else:
+            for key in REQUIRED_DIRECTORIES:
+                value = directories.get(key)
+                if not isinstance(value, str) or not value.strip():
+                    errors.append(f"directories.{key} must be a non-empty string")
+            music_library = directories.get('music_library')
+            if isinstance(music_library, str) and music_library.strip() and not os.path.isdir(music_library):
+                errors.append(f"directories.music_library does not exist or is not a directory: {music_library}")
+
+        download = config.get('music-download')
+        if not isinstance(download, dict):
+            errors.append("Missing [music-download] section")
+        else:
+            enabled = download.get('music-download', False)
+            if not isinstance(enabled, bool):
+                errors.append("music-download.music-download must be true or false")
+            elif enabled:
+                objects = download.get('download-object')
+                objects = [objects] if isinstance(objects, str) else objects
+                if not isinstance(objects, list) or not objects or any(obj not in DOWNLOAD_OBJECTS for obj in objects):
+                    errors.append(f"music-download.download-object must be one or a list of {', '.join(DOWNLOAD_OBJECTS)}")
+                for key in ('download-mode', 'download-client'):
+                    if not isinstance(download.get(key), str):
+                        errors.append(f"music-download.{key} must be a string")
+
+        errors.extend(Settings._validate_scheduler(config.get('download-scheduler', {})))
+        errors.extend(Settings._validate_path_mapping(config.get('path-mapping', {})))
+
+        canonicalization = config.get('canonicalization', {})
+        threshold = canonicalization.get('threshold', 92)
+        if not isinstance(threshold, (int, float)) or isinstance(threshold, bool) or not 0 < threshold <= 100:
+            errors.append("canonicalization.threshold must be a number in (0, 100]")
+        block_size = canonicalization.get('block_size', 1024)
+        if not isinstance(block_size, int) or isinstance(block_size, bool) or block_size < 1:
+            errors.append("canonicalization.block_size must be a positive integer")
+
+        journal = config.get('journal', {})
+        if not isinstance(journal.get('path', 'logs/journal.jsonl'), str):
+            errors.append("journal.path must be a string")
+        for key in ('batch-size', 'max-attempts'):
+            value = journal.get(key, 1)
+            if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+                errors.append(f"journal.{key} must be a positive integer")
+
+        debounce = config.get('watch', {}).get('debounce-seconds', 10)
+        if not isinstance(debounce, (int, float)) or isinstance(debounce, bool) or debounce < 0:
+            errors.append("watch.debounce-seconds must be a non-negative number")
+
+        for section in STAGE_SECTIONS:
+            if section not in config:
+                continue
+            if not isinstance(config[section], dict):
+                errors.append(f"[{section}] must be a table")
+            elif not isinstance(config[section].get('enabled', False), bool):
+                errors.append(f"{section}.enabled must be true or false")
+
+        mirror = config.get('lossy_mirror', {})
+        if isinstance(mirror, dict) and mirror.get('enabled', False) is True:
+            for key in ('mirror_directory', 'codec', 'bitrate', 'extension'):
+                if not isinstance(mirror.get(key), str) or not mirror[key].strip():
+                    errors.append(f"lossy_mirror.{key} must be a non-empty string")
+            workers = mirror.get('workers', 0)
+            if not isinstance(workers, int) or isinstance(workers, bool) or workers < 0:
+                errors.append("lossy_mirror.workers must be a non-negative integer")
+            music_library = directories.get('music_library') if isinstance(directories, dict) else None
+            mirror_directory = mirror.get('mirror_directory')
+            if isinstance(music_library, str) and isinstance(mirror_directory, str) and mirror_directory.strip():
+                library, target = os.path.abspath(music_library), os.path.abspath(mirror_directory)
+                if os.path.commonpath([library, target]) == library:
+                    errors.append("lossy_mirror.mirror_directory must not be inside directories.music_library")
+
+        return errors
+
+    @staticmethod
+    def _validate_scheduler(scheduler):
+        errors = []
+        if not isinstance(scheduler, dict):
+            return ["[download-scheduler] must be a table"]
+        for key in ('max-bytes-per-second', 'min-free-bytes'):
+            value = scheduler.get(key, 0)
+            if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+                errors.append(f"download-scheduler.{key} must be a non-negative integer")
+        for index, window in enumerate(scheduler.get('windows', [])):
+            if not isinstance(window, dict) or not all(CLOCK_PATTERN.match(str(window.get(key, ''))) for key in ('start', 'end')):
+                errors.append(f"download-scheduler.windows[{index}] needs start and end as HH:MM")
+        return errors
+
+    @staticmethod
+    def _validate_path_mapping(path_mapping):
+        errors = []
+        if not isinstance(path_mapping, dict):
+            return ["[path-mapping] must be a table"]
+        depth = path_mapping.get('album-depth', 2)
+        if not isinstance(depth, int) or isinstance(depth, bool) or depth < 1:
+            errors.append("path-mapping.album-depth must be a positive integer")
+        for index, rule in enumerate(path_mapping.get('rules', [])):
+            if not isinstance(rule, dict) or not isinstance(rule.get('remote'), str):
+                errors.append(f"path-mapping.rules[{index}] needs a remote prefix")
+                continue
+            if 'local' in rule and not isinstance(rule['local'], str):
+                errors.append(f"path-mapping.rules[{index}].local must be a string")
+            if rule.get('regex', False):
+                try:
+                    re.compile(rule['remote'])
+                except re.error as e:
+                    errors.append(f"path-mapping.rules[{index}].remote is not a valid regex: {e}")
+        return errors
+
+    def get_service_credentials(self, service):
+        if service not in self.credentials:
+            raise KeyError(f"Credentials for service '{service}' not found")
+        return self.credentials[service]
\ No newline at end of file
@@ -0,0 +1,35 @@
+# utils/shard.py
+
+import zlib
+
+class Shard:
+    """Deterministic 1-based partition 'i/n' of string keys.
+
+    Keys are hashed with CRC32 rather than hash() so every process and machine
+    agrees on the owner of a given artist, playlist or album folder.
+    """
+    def __init__(self, index=1, count=1):
+        if count < 1 or not 1 <= index <= count:
+            raise ValueError(f"Invalid shard {index}/{count}: expected 1 <= i <= n")
+        self.index = index
+        self.count = count
+
+    @classmethod
+    def parse(cls, spec):
+        try:
+            index, count = (int(part) for part in spec.split('/'))
+        except ValueError:
+            raise ValueError(f"Invalid shard '{spec}': expected the form i/n, e.g. 2/4")
+        return cls(index, count)
+
+    def owns(self, key):
+        if self.count == 1:
+            return True
+        bucket = zlib.crc32(key.strip().casefold().encode('utf-8')) % self.count
+        return bucket == self.index - 1
+
+    def filter(self, keys):
+        return [key for key in keys if self.owns(key)]
+
+    def __str__(self):
+        return f"{self.index}/{self.count}"
\ No newline at end of file